@@ -1,66 +1,101 @@
+import asyncio
 import logging
-
-import requests
+from concurrent.futures import ThreadPoolExecutor
 
 from db_config import db_config
 from utils import (
-    process_page, fetch_property_urls, fetch_property_details, add_geocode_data, insert_property_details,
+    REQUEST_ERRORS, Inserter, PageUnavailableError, create_session, geocode_cache, process_page,
+    fetch_property_urls, fetch_property_details, add_geocode_data_batch, skip_request_errors,
 )
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
+
+# Consecutive failed attempts at a listing page before a site is given up
+MAX_FAILED_PAGES = 3
 
 
-def scrape_site2(base_url):
+async def scrape_site2(base_url, inserter, session):
     headers = {
         "User-Agent": "Mozilla/5.0 ..."
     }
 
     current_page = 0
+    failed_pages = 0
 
-    while True:
+    while failed_pages < MAX_FAILED_PAGES:
         page_url = f"{base_url}index{current_page}.html" if current_page > 0 else base_url
-        property_urls = fetch_property_urls(page_url, headers)
+        try:
+            property_urls = await fetch_property_urls(page_url, headers, session)
+        except (*REQUEST_ERRORS, PageUnavailableError) as e:
+            logger.error("Could not load listing page %s: %r", page_url, e)
+            failed_pages += 1
+            continue
+        failed_pages = 0
 
         if not property_urls:
             break
 
-        for url in property_urls:
-            property_details = fetch_property_details(url, headers)
-            if property_details:
-                property_details = add_geocode_data(property_details)
-                insert_property_details(db_config, property_details)
+        results = await asyncio.gather(
+            *[
+                skip_request_errors(url, fetch_property_details(url, headers, session))
+                for url in property_urls
+            ]
+        )
+
+        properties = [property_details for property_details in results if property_details]
+        properties = await add_geocode_data_batch(properties, session)
+        inserter.insert_many(properties)
 
         current_page += 1
 
 
-def scrape_site1(base_url):
+async def scrape_site1(base_url, inserter, session):
     index_increment = 24
     current_index = 0
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
     }
 
-    while True:
-        page_url = f"{base_url}&index={current_index}"
-        process_page(page_url, headers, db_config)
+    failed_pages = 0
 
-        response = requests.get(page_url, headers=headers)
-        if "There are no more properties to show" in response.text:
+    while failed_pages < MAX_FAILED_PAGES:
+        page_url = f"{base_url}&index={current_index}"
+        try:
+            last_page = await process_page(page_url, headers, inserter, session)
+        except (*REQUEST_ERRORS, PageUnavailableError) as e:
+            logger.error("Could not load listing page %s: %r", page_url, e)
+            failed_pages += 1
+            continue
+        failed_pages = 0
+
+        if last_page:
             break
         current_index += index_increment
 
 
 # Main scraping logic
-def main():
+async def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     site1_base_url_uk = "https://www.rightmove.co.uk/property-to-rent/find.html?locationIdentifier=POSTCODE%5E840076&radius=10.0"
     site2_base_url_bg = "https://www.bulgarianproperties.com/Sofia_imoti/properties_in_bulgaria/"
-    scrape_site2(site2_base_url_bg)
-    scrape_site1(site1_base_url_uk)
+
+    # Fixed-size pool for the asyncio.to_thread parse calls; keeps them off the event loop
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=16))
+
+    inserter = Inserter(db_config)
+    try:
+        async with create_session() as session:
+            await scrape_site2(site2_base_url_bg, inserter, session)
+            await scrape_site1(site1_base_url_uk, inserter, session)
+    finally:
+        inserter.close()
+        geocode_cache.close()
 
     print('Finished Scraping')
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,19 +1,234 @@
-import json
+import asyncio
+import codecs
 import logging
 import os
 import re
-from urllib.parse import urljoin, urlparse, parse_qs
+import shelve
+import weakref
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+import aiohttp
+import MySQLdb
+import orjson
+from selectolax.lexbor import LexborHTMLParser
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Upper bound on a server-requested Retry-After delay, in seconds
+MAX_RETRY_AFTER = 60
+# Errors a request can still raise once fetch has used up its retries
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+REQUEST_TIMEOUT = 10
+
+BATCH_SIZE = 50
+
+INSERT_QUERY = """
+INSERT INTO properties3 (title, price, address, key_features, description, images, price_per_month, price_per_week,
+right_image_url, latitude, longitude, country
+)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
 
-import mysql.connector
-import requests
-from bs4 import BeautifulSoup
+_PRICE_RE = re.compile(r"[1-9]\d{0,2}(?:,\d{3})*")
+_NON_NUMERIC_RE = re.compile(r'[^\d\s\-]')
+_NUM_RE = re.compile(r'\d+(?:\s?\d+)*')
+_DECIMAL_RE = re.compile(r'\d+(?:\.\d+)?')
+# "q=lat,lng" in a query string, with the comma and space possibly URL-encoded
+_QCOORDS_RE = re.compile(r"[?&]q=([-+]?\d*\.\d+|\d+)(?:,|%2C)(?:\s|\+|%20)*([-+]?\d*\.\d+|\d+)", re.IGNORECASE)
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Substrings of image URLs that are logos or banners rather than property pictures
+_LOGO_RE = re.compile(r"_bp_pd_h\.jpg|branch_logo_|_bp_mpu")
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=..."> near the top of a page
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+# Marker on a Rightmove listing page past the last page of results
+NO_MORE_PROPERTIES = b"There are no more properties to show"
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocoding_cache")
+# Most addresses kept in memory; older entries are still served from the shelve file
+GEOCODE_CACHE_SIZE = 100_000
+
+# Caps the number of requests in flight at once so the target sites are not hammered
+REQUEST_CONCURRENCY = 10
+
+# Per-session request semaphores, created inside the running event loop by create_session
+_request_limits = weakref.WeakKeyDictionary()
+
+
+def create_session():
+    """
+    Creates the aiohttp session shared by all scraping and geocoding requests.
+
+    Must be called from within the running event loop, since the session's
+    request semaphore is bound to that loop.
+
+    :return: aiohttp.ClientSession with a pooled connector and a per-request timeout
+    """
+    connector = aiohttp.TCPConnector(limit=20, limit_per_host=10)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    _request_limits[session] = asyncio.Semaphore(REQUEST_CONCURRENCY)
+    return session
+
+
+def retry_delay(response, attempt):
+    """
+    Works out how long to wait before retrying a request.
+    :param response: Response that triggered the retry, or None after a connection error
+    :param attempt: Zero-based number of the attempt that failed
+    :return: Delay in seconds, honouring a numeric Retry-After header when present
+    """
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(int(retry_after), MAX_RETRY_AFTER)
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+def parse_html(content, charset=None):
+    """
+    Parses a page body into a selectolax tree, honouring the page's encoding.
+
+    Lexbor reads bytes as UTF-8, so bodies in any other encoding (taken from
+    the Content-Type header, else from a <meta> charset declaration) are
+    decoded to str first.
+
+    :param content: Raw response body
+    :param charset: Charset from the response's Content-Type header, if any
+    :return: LexborHTMLParser tree
+    """
+    if not charset:
+        match = _META_CHARSET_RE.search(content, 0, 2048)
+        charset = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        encoding = codecs.lookup(charset).name
+    except LookupError:
+        encoding = "utf-8"
+    if encoding != "utf-8":
+        content = content.decode(encoding, errors="replace")
+    return LexborHTMLParser(content)
+
+
+async def fetch(session, url, headers=None, params=None):
+    """
+    Makes a GET request through the shared session, retrying transient server
+    errors, connection errors and timeouts.
+    :param session: aiohttp session to use for the request
+    :param url: URL to fetch
+    :param headers: Headers to use for the request
+    :param params: Query parameters to use for the request
+    :return: Tuple of (status code, response body, charset from Content-Type or None)
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with _request_limits[session]:
+                async with session.get(url, headers=headers, params=params) as response:
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        return response.status, await response.read(), response.charset
+                    delay = retry_delay(response, attempt)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+            delay = retry_delay(None, attempt)
+        # Back off without holding a request slot
+        await asyncio.sleep(delay)
+
+
+class PageUnavailableError(Exception):
+    """
+    Raised when a listing page cannot be loaded, as opposed to a page that
+    loads but marks the end of the results.
+    """
+
+
+async def skip_request_errors(url, coroutine):
+    """
+    Awaits a coroutine that requests a single URL, so that one failed request
+    does not abort the other requests gathered alongside it.
+    :param url: URL requested by the coroutine, used for logging
+    :param coroutine: Coroutine to await
+    :return: The coroutine's result, or None if its request failed
+    """
+    try:
+        return await coroutine
+    except REQUEST_ERRORS as e:
+        logger.error("Request error on %s: %r", url, e)
+        return None
+
+
+def normalize_address(address):
+    """
+    Normalizes an address so that trivially different spellings share a cache entry.
+    :param address: Address to normalize
+    :return: Lower-cased address with collapsed whitespace
+    """
+    return " ".join(address.lower().split())
+
+
+class GeocodeCache:
+    """
+    Caches geocoding results by normalized address, in memory and on disk.
+
+    Lookups are served from an in-memory LRU of at most maxsize entries first
+    and fall back to a shelve file, so repeated addresses within a run and
+    across runs never reach the Google Geocoding API. The shelve file is
+    opened on first use.
+    """
+
+    def __init__(self, path, maxsize=GEOCODE_CACHE_SIZE):
+        self.path = path
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.shelf = None
 
+    def _open(self):
+        if self.shelf is None:
+            self.shelf = shelve.open(self.path)
+        return self.shelf
 
-def geocode_address(address):
+    def get(self, address):
+        """
+        :param address: Address to look up
+        :return: Cached (latitude, longitude) tuple, or None on a miss
+        """
+        key = normalize_address(address)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        coordinates = self._open().get(key)
+        if coordinates is not None:
+            self._remember(key, coordinates)
+        return coordinates
+
+    def set(self, address, coordinates):
+        """
+        :param address: Address that was geocoded
+        :param coordinates: (latitude, longitude) tuple to store
+        """
+        key = normalize_address(address)
+        self._remember(key, coordinates)
+        self._open()[key] = coordinates
+
+    def _remember(self, key, coordinates):
+        self.memory[key] = coordinates
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        if self.shelf is not None:
+            self.shelf.close()
+            self.shelf = None
+
+
+geocode_cache = GeocodeCache(GEOCODE_CACHE_PATH)
+
+
+async def geocode_address(address, session):
     """
     Retrieves the latitude and longitude for a given address using the Google Geocoding API.
 
@@ -23,18 +238,19 @@ def geocode_address(address):
     API call fails or no coordinates are found, the function returns None for both latitude and longitude.
 
     :param address: The address for which to obtain geocode data
+    :param session: aiohttp session to use for the request
     :return: A tuple of (latitude, longitude) if successful, otherwise (None, None)
     """
     GOOGLE_API_KEY = os.getenv("google_key", "None")
 
     params = {"address": address, "key": GOOGLE_API_KEY}
 
-    response = requests.get(
-        "https://maps.googleapis.com/maps/api/geocode/json", params=params
+    status, body, _ = await fetch(
+        session, "https://maps.googleapis.com/maps/api/geocode/json", params=params
     )
 
-    if response.status_code == 200:
-        data = response.json()
+    if status == 200:
+        data = orjson.loads(body)
         if data["status"] == "OK":
             latitude = data["results"][0]["geometry"]["location"]["lat"]
             longitude = data["results"][0]["geometry"]["location"]["lng"]
@@ -42,63 +258,55 @@ def geocode_address(address):
     return None, None
 
 
-def make_soup(url, headers):
+async def make_tree(url, headers, session):
     """
-    Makes a GET request to the provided URL and returns a BeautifulSoup object.
+    Makes a GET request to the provided URL and returns a parsed selectolax tree
+    along with the raw response body.
     :param url: URL to fetch
     :param headers: Headers to use for the request
-    :return: BeautifulSoup object
+    :param session: aiohttp session to use for the request
+    :return: Tuple of (LexborHTMLParser tree or None, response body)
     """
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return BeautifulSoup(response.content, "html.parser")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Request error: {e}")
-        return None
+    status, content, charset = await fetch(session, url, headers=headers)
+    if status != 200:
+        logger.error("Request error: %s for url %s", status, url)
+        return None, content
+    # selectolax has no incremental parser, so the whole body is buffered before parsing
+    return await asyncio.to_thread(parse_html, content, charset), content
 
 
 # Function to extract details from a property's detail page
-def extract_property_details(detail_url, headers):
+async def extract_property_details(detail_url, headers, session):
     """
     Extracts property details from a given detail page URL.
     :param detail_url: URL of the property's detail page
     :param headers: Headers to use for the request
+    :param session: aiohttp session to use for the request
     :return: Dictionary containing property details
     """
-    soup = make_soup(detail_url, headers)
-    if not soup:
+    tree, _ = await make_tree(detail_url, headers, session)
+    if not tree:
         return None
 
     # Extracting various details
-    title = soup.find("h1").text.strip() if soup.find("h1") else "Title Not Found"
-    price = (
-        soup.find("div", class_="_1gfnqJ3Vtd1z40MlC0MzXu").text.strip()
-        if soup.find("div", class_="_1gfnqJ3Vtd1z40MlC0MzXu")
-        else "Price Not Found"
-    )
-    address = (
-        soup.find("h1", itemprop="streetAddress").text.strip()
-        if soup.find("h1", itemprop="streetAddress")
-        else "Address Not Found"
-    )
+    title_tag = tree.css_first("h1")
+    title = title_tag.text().strip() if title_tag else "Title Not Found"
+    price_tag = tree.css_first("div._1gfnqJ3Vtd1z40MlC0MzXu")
+    price = price_tag.text().strip() if price_tag else "Price Not Found"
+    address_tag = tree.css_first('h1[itemprop="streetAddress"]')
+    address = address_tag.text().strip() if address_tag else "Address Not Found"
 
     # Extracting key features
-    features = soup.find_all("li", class_="lIhZ24u1NHMa5Y6gDH90A")
-    key_features = [feature.text.strip() for feature in features]
+    features = tree.css("li.lIhZ24u1NHMa5Y6gDH90A")
+    key_features = [feature.text().strip() for feature in features]
 
     # Extracting property description
-    description = (
-        soup.find(
-            "div", class_="STw8udCxUaBUMfOOZu0iL _3nPVwR0HZYQah5tkVJHFh5"
-        ).text.strip()
-        if soup.find("div", class_="STw8udCxUaBUMfOOZu0iL _3nPVwR0HZYQah5tkVJHFh5")
-        else "Description Not Found"
-    )
+    description_tag = tree.css_first("div.STw8udCxUaBUMfOOZu0iL._3nPVwR0HZYQah5tkVJHFh5")
+    description = description_tag.text().strip() if description_tag else "Description Not Found"
 
     # Extracting images
-    image_tags = soup.find_all("img")
-    image_urls = [img["src"] for img in image_tags if "src" in img.attrs]
+    image_tags = tree.css("img[src]")
+    image_urls = [img.attributes["src"] for img in image_tags if img.attributes["src"]]
 
     data_payload = {
         "title": title,
@@ -127,15 +335,10 @@ def post_process_the_image_urls(property_details):
     image_urls = property_details["images"]
     corrected_images = []
     for image_url in image_urls:
-        image = image_url.split("/")[-1]
-        sub_strings = ["_bp_pd_h.jpg", "branch_logo_", "_bp_mpu"]
-        if any(sub_string in image for sub_string in sub_strings):
-            logging.info(f"Logo detected: {image_url}")
+        if _LOGO_RE.search(image_url):
             continue
-        else:
-            logging.info(f"image... {image_url}")
-            corrected_images.append(image_url)
-    property_details["right_image_url"] = json.dumps(corrected_images)
+        corrected_images.append(image_url)
+    property_details["right_image_url"] = orjson.dumps(corrected_images).decode()
     return property_details
 
 
@@ -151,123 +354,224 @@ def post_process_the_price(property_details):
     :param property_details: Dictionary containing details of a property
     :return: Updated property details with separated price per month and week
     """
-    pattern = r"[1-9]\d{0,2}(?:,\d{3})*"
-    amount = []
-    price_amount = property_details["price"].split("£")
-    matches = []
-    for price in price_amount:
-        matches = re.findall(pattern, price)
-        amount.extend(matches)
-    if matches:
-        property_details["price_per_month"] = amount[0]
-        property_details["price_per_week"] = amount[1]
+    amounts = _PRICE_RE.findall(property_details["price"])
+    property_details["price_per_month"] = amounts[0] if amounts else None
+    property_details["price_per_week"] = amounts[1] if len(amounts) > 1 else None
     return property_details
 
 
-def add_geocode_data(property_details):
+async def geocode_cached(address, session):
+    """
+    Geocodes an address, serving repeated addresses from the geocode cache.
+    :param address: The address for which to obtain geocode data
+    :param session: aiohttp session to use for the request
+    :return: A tuple of (latitude, longitude) if successful, otherwise (None, None)
+    """
+    coordinates = geocode_cache.get(address)
+    if coordinates is None:
+        coordinates = await skip_request_errors(address, geocode_address(address, session)) or (None, None)
+        if None not in coordinates:
+            geocode_cache.set(address, coordinates)
+    return coordinates
+
+
+async def add_geocode_data_batch(properties, session):
     """
-    Adds geocode data (latitude and longitude) to the property details.
+    Adds geocode data (latitude and longitude) to the details of several properties.
 
-    This function uses the 'geocode_address' function to obtain geocode
-    information for the address in the property details. It updates the
-    property details with latitude and longitude if available.
+    Each distinct address is geocoded once through 'geocode_cached', and the
+    lookups for all addresses run concurrently (throttled by the session's request limit).
+    The property details are updated with latitude and longitude if available.
 
-    :param property_details: Dictionary containing details of a property
-    :return: Updated property details with geocode data
-    """
-    latitude, longitude = geocode_address(property_details["address"])
-    if latitude is not None and longitude is not None:
-        property_details["latitude"] = latitude
-        property_details["longitude"] = longitude
-    else:
-        logging.warning(f"Could not geocode address: {property_details['address']}")
-    return property_details
+    :param properties: List of dictionaries containing property details
+    :param session: aiohttp session to use for the requests
+    :return: The same list of property details with geocode data added
+    """
+    addresses = {normalize_address(p["address"]): p["address"] for p in properties}
+    results = await asyncio.gather(
+        *[geocode_cached(address, session) for address in addresses.values()]
+    )
+    coordinates_by_address = dict(zip(addresses, results))
+
+    for property_details in properties:
+        latitude, longitude = coordinates_by_address[normalize_address(property_details["address"])]
+        if latitude is not None and longitude is not None:
+            property_details["latitude"] = latitude
+            property_details["longitude"] = longitude
+        else:
+            logger.warning("Could not geocode address: %s", property_details["address"])
+    return properties
 
 
-def insert_property_details(db_config, property_details):
+def property_values(property_details):
     """
-    Inserts property details into the database.
-    :param db_config: Database configuration
+    Builds the row values for the properties table from the property details.
     :param property_details: Dictionary containing property details
+    :return: Tuple of column values in INSERT_QUERY order
     """
-    try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-
-        # Convert list to JSON string for storage
-        key_features_json = json.dumps(property_details["key_features"])
-        images_json = json.dumps(property_details["images"])
-
-        insert_query = """
-        INSERT INTO properties3 (title, price, address, key_features, description, images, price_per_month, price_per_week,
-        right_image_url, latitude, longitude, country
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    # Convert list to JSON string for storage
+    key_features_json = orjson.dumps(property_details["key_features"]).decode()
+    images_json = orjson.dumps(property_details["images"]).decode()
+
+    return (
+        property_details["title"],
+        property_details["price"],
+        property_details["address"],
+        key_features_json,
+        property_details["description"],
+        images_json,
+        property_details.get("price_per_month"),
+        property_details.get("price_per_week"),
+        property_details.get("right_image_url"),
+        property_details.get("latitude"),
+        property_details.get("longitude"),
+        property_details["country"],
+    )
+
+
+class Inserter:
+    """
+    Inserts property details into the database over a single connection.
+
+    The connection and cursor are opened once and reused for every batch,
+    so rows do not pay a connection handshake each. If the connection is
+    lost, it is reopened and the failed batch is retried once.
+    """
+
+    def __init__(self, db_config):
+        self.db_config = db_config
+        self.conn = None
+        self.cursor = None
+        self.connect()
+
+    def connect(self):
+        self.conn = MySQLdb.connect(**self.db_config, autocommit=False)
+        self.cursor = self.conn.cursor()
+
+    def insert_many(self, properties):
+        """
+        Inserts the details of several properties, committing once per batch.
+        Stops at the first batch that cannot be written.
+        :param properties: List of dictionaries containing property details
+        """
+        for start in range(0, len(properties), BATCH_SIZE):
+            rows = [property_values(p) for p in properties[start:start + BATCH_SIZE]]
+            if not self.insert_batch(rows):
+                logger.error("Skipping %d remaining records", len(properties) - start - len(rows))
+                break
+
+    def insert_batch(self, rows):
+        """
+        Writes and commits one batch of rows. If the connection was lost, it is
+        reopened and the batch is retried once.
+        :param rows: List of value tuples in INSERT_QUERY order
+        :return: True if the batch was committed
         """
-        values = (
-            property_details["title"],
-            property_details["price"],
-            property_details["address"],
-            key_features_json,
-            property_details["description"],
-            images_json,
-            property_details["price_per_month"],
-            property_details["price_per_week"],
-            property_details["right_image_url"],
-            property_details["latitude"],
-            property_details["longitude"],
-            property_details["country"],
-        )
-
-        cursor.execute(insert_query, values)
-        conn.commit()
-    except mysql.connector.Error as error:
-        print(f"Failed to insert record into MySQL table: {error}")
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            self._write(rows)
+            return True
+        except MySQLdb.Error as error:
+            logger.error("Failed to insert %d records into MySQL table: %s", len(rows), error)
+            self.rollback()
+
+        if self.conn is not None:
+            # The connection is still usable, so the error came from the data itself
+            return False
+        try:
+            self._write(rows)
+            return True
+        except MySQLdb.Error as error:
+            logger.error("Retry after reconnecting failed for %d records: %s", len(rows), error)
+            self.rollback()
+            return False
+
+    def _write(self, rows):
+        if self.conn is None:
+            self.connect()
+        self.cursor.executemany(INSERT_QUERY, rows)
+        self.conn.commit()
+
+    def rollback(self):
+        """
+        Rolls back the failed batch, dropping the connection if it is no longer usable.
+        """
+        if self.conn is None:
+            return
+        try:
+            self.conn.rollback()
+        except MySQLdb.Error as error:
+            logger.warning("Database connection lost, dropping it: %s", error)
+            self.close()
+
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            self.cursor.close()
+            self.conn.close()
+        except MySQLdb.Error:
+            pass
+        finally:
+            self.conn = None
+            self.cursor = None
 
 
 def extract_first_price(price_str):
     # Removing currency symbols and unwanted text
-    price_str = re.sub(r'[^\d\s\-]', '', price_str)
+    price_str = _NON_NUMERIC_RE.sub('', price_str)
 
     # Find all number sequences
-    numbers = re.findall(r'\d+(?:\s?\d+)*', price_str)
+    numbers = _NUM_RE.findall(price_str)
     numbers = [float(num.replace(' ', '')) for num in numbers]
 
     # Return the first number or None
     return numbers[0] if numbers else None
 
 
-def process_page(url, headers, db_config):
+async def process_page(url, headers, inserter, session):
     """
     Processes a single page of property listings.
     :param url: URL of the page to process
     :param headers: Headers to use for the request
-    :param db_config: Database configuration
+    :param inserter: Inserter used to store the properties
+    :param session: aiohttp session to use for the requests
+    :return: True if this page marks the end of the listing results
+    :raises PageUnavailableError: If the page could not be loaded and is not the end of the results
     """
-    soup = make_soup(url, headers)
-    if not soup:
-        return
+    tree, content = await make_tree(url, headers, session)
+    last_page = NO_MORE_PROPERTIES in content
+    if not tree:
+        if last_page:
+            return True
+        raise PageUnavailableError(url)
 
     # Extract the URLs for the detail pages3
     detail_links = [
-        a["href"]
-        for a in soup.select("a.propertyCard-link")
-        if "properties" in a["href"]
+        a.attributes["href"]
+        for a in tree.css("a.propertyCard-link[href]")
+        if "properties" in (a.attributes["href"] or "")
     ]
 
-    for link in detail_links:
-        detail_url = f"https://www.rightmove.co.uk{link}"
-        property_details = extract_property_details(detail_url, headers=headers)
+    # Fetch all detail pages of the listing concurrently, skipping any that fail
+    detail_urls = [f"https://www.rightmove.co.uk{link}" for link in detail_links]
+    results = await asyncio.gather(
+        *[
+            skip_request_errors(detail_url, extract_property_details(detail_url, headers, session))
+            for detail_url in detail_urls
+        ]
+    )
 
+    properties = []
+    for property_details in results:
         if property_details:
             # Post-process the price and image URLs
             property_details = post_process_the_price(property_details)
             property_details = post_process_the_image_urls(property_details)
-            property_details = add_geocode_data(property_details)
-            insert_property_details(db_config, property_details)
+            properties.append(property_details)
+
+    properties = await add_geocode_data_batch(properties, session)
+    inserter.insert_many(properties)
+    return last_page
 
 
 def clean_text(text):
@@ -281,7 +585,7 @@ def preprocess_price(price_str):
     price_str = price_str.replace('€', '').replace(',', '')
 
     # Extract all numbers
-    numbers = re.findall(r'\d+(?:\.\d+)?', price_str)
+    numbers = _DECIMAL_RE.findall(price_str)
     numbers = [float(num.replace(' ', '')) for num in numbers]
 
     # Handle different formats
@@ -297,47 +601,48 @@ def preprocess_price(price_str):
     return numbers[0] if numbers else None
 
 
-def fetch_property_urls(listing_url, headers):
-    response = requests.get(listing_url, headers=headers)
-    if response.status_code != 200:
-        return []
+async def fetch_property_urls(listing_url, headers, session):
+    status, content, charset = await fetch(session, listing_url, headers=headers)
+    if status != 200:
+        logger.error("Request error: %s for url %s", status, listing_url)
+        raise PageUnavailableError(listing_url)
 
-    soup = BeautifulSoup(response.content, "html.parser")
-    return [urljoin(listing_url, a['href']) for a in soup.select('a.title[href]')]
+    tree = await asyncio.to_thread(parse_html, content, charset)
+    return [urljoin(listing_url, a.attributes['href'] or '') for a in tree.css('a.title[href]')]
 
 
-def fetch_property_details(detail_url, headers):
-    response = requests.get(detail_url, headers=headers)
-    if response.status_code != 200:
+async def fetch_property_details(detail_url, headers, session):
+    status, content, charset = await fetch(session, detail_url, headers=headers)
+    if status != 200:
         return None
 
-    detail_soup = BeautifulSoup(response.content, "html.parser")
+    detail_tree = await asyncio.to_thread(parse_html, content, charset)
 
     # Extract the title
-    title_tag = detail_soup.find('h1', class_='title')
-    title = clean_text(title_tag.get_text(strip=True)) if title_tag else 'Title not found'
+    title_tag = detail_tree.css_first('h1.title')
+    title = clean_text(title_tag.text(strip=True)) if title_tag else 'Title not found'
 
     # Extract the description
-    description_tag = detail_soup.find('div', class_='text')
-    description = clean_text(description_tag.get_text(strip=True)) if description_tag else 'Description not found'
+    description_tag = detail_tree.css_first('div.text')
+    description = clean_text(description_tag.text(strip=True)) if description_tag else 'Description not found'
 
     # Extract images
-    image_tags = detail_soup.find_all('img')
+    image_tags = detail_tree.css('img[src]')
     detailed_images = [
-        urljoin(detail_url, img['src'])
+        urljoin(detail_url, img.attributes['src'])
         for img in image_tags
-        if img.get('src') and not img['src'].endswith(('.png', '.svg'))
+        if img.attributes['src'] and not img.attributes['src'].endswith(('.png', '.svg'))
     ]
 
     # Extract location information
-    location_tag = detail_soup.find('span', class_='location')
-    location = location_tag.text.strip() if location_tag else 'No location info'
+    location_tag = detail_tree.css_first('span.location')
+    location = location_tag.text().strip() if location_tag else 'No location info'
 
     # Extract key features
     property_features = {}
-    for characteristic in detail_soup.select('.component-single-property-characteristic .characteristic'):
-        label = characteristic.find('span', class_='label').get_text(strip=True)
-        value = characteristic.find('span', class_='value').get_text(strip=True)
+    for characteristic in detail_tree.css('.component-single-property-characteristic .characteristic'):
+        label = characteristic.css_first('span.label').text(strip=True)
+        value = characteristic.css_first('span.value').text(strip=True)
         property_features[label] = value
 
     # Construct key features string
@@ -345,28 +650,20 @@ def fetch_property_details(detail_url, headers):
     key_features_cleaned = clean_text(key_features)
 
     # Extract price
-    price_tag = detail_soup.find('span', class_='regular-price')
-    price = clean_text(price_tag.get_text(strip=True)) if price_tag else 'Price not found'
-
-    processed_price = int(extract_first_price(price)) if extract_first_price(price) else 0
-    processed_price = processed_price
+    price_tag = detail_tree.css_first('span.regular-price')
+    price = clean_text(price_tag.text(strip=True)) if price_tag else 'Price not found'
 
-    print(f"Processed price: {processed_price}")
+    first_price = extract_first_price(price)
+    processed_price = int(first_price) if first_price else 0
 
     # Extract coordinates from Google Maps iframe
     lat, lng = None, None
-    iframe_tag = detail_soup.find('iframe')
-
-    if iframe_tag and 'src' in iframe_tag.attrs:
-        iframe_src = iframe_tag['src']
-        parsed_url = urlparse(iframe_src)
-        query_params = parse_qs(parsed_url.query)
-
-        if 'q' in query_params:
-            coords = query_params['q'][0]
-            coords_match = re.match(r"([-+]?\d*\.\d+|\d+),\s*([-+]?\d*\.\d+|\d+)", coords)
-            if coords_match:
-                lat, lng = map(float, coords_match.groups())
+    iframe_tag = detail_tree.css_first('iframe[src]')
+
+    if iframe_tag:
+        coords_match = _QCOORDS_RE.search(iframe_tag.attributes['src'] or '')
+        if coords_match:
+            lat, lng = map(float, coords_match.groups())
 
     return {
         'title': title,